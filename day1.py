@@ -64,32 +64,140 @@ Although it hasn't changed, you can still get your puzzle input.
 
 """
 
+import argparse
+import glob
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+
+CHUNK_SIZE = 1 << 20 # bytes of change log parsed at a time
+
+def read_deltas(filename, chunk_size = CHUNK_SIZE):
+	# stream signed changes out of a memory mapped file, one chunk of
+	# whole lines at a time, so memory use does not grow with the log
+	with open(filename, "rb") as infile:
+		infile.seek(0, 2)
+		size = infile.tell()
+		if size == 0:
+			return
+		buf = mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ)
+		try:
+			start = 0
+			while start < size:
+				end = min(start + chunk_size, size)
+				if end < size:
+					# pull chunk back to the last complete line
+					nl = buf.rfind(b"\n", start, end)
+					if nl == -1: # single line longer than a chunk
+						nl = buf.find(b"\n", end)
+						if nl == -1:
+							nl = size - 1
+					end = nl + 1
+				for token in buf[start:end].split():
+					yield int(token)
+				start = end
+		finally:
+			buf.close()
+
+def load_deltas(filename, chunk_size = CHUNK_SIZE):
+	# compact array of changes for repeated passes ('l' is 64-bit on
+	# LP64 platforms; python 2 array has no 'q' typecode)
+	return array('l', read_deltas(filename, chunk_size))
+
+def first_repeat(deltas):
+	# frequency after t changes is prefix[t % n] + (t / n) * drift,
+	# so only the first pass of prefix sums needs to be walked
+	n = len(deltas)
+	prefix = []
+	seen_set = set()
+	freq = 0
+	for item in deltas:
+		if freq in seen_set: # repeat inside the first pass
+			return freq
+		seen_set.add(freq)
+		prefix.append(freq)
+		freq += item
+	drift = freq
+	if drift == 0: # list returns to the start frequency
+		return 0
+	# a later pass can only reach prefix[j] from a prefix[i] in the
+	# same residue class, after (prefix[j] - prefix[i]) / drift passes
+	groups = {}
+	for idx, value in enumerate(prefix):
+		groups.setdefault(value % abs(drift), []).append((value, idx))
+	best = None # (time of repeat, frequency)
+	for group in groups.values():
+		group.sort(reverse = drift < 0) # order in direction of drift
+		for k in range(len(group) - 1):
+			value, idx = group[k]
+			target = group[k+1][0]
+			t = (target - value) // drift * n + idx
+			if best is None or t < best[0]:
+				best = (t, target)
+	if best is None: # no residues collide, frequency never repeats
+		return None
+	return best[1]
+
+def solve_file(filename):
+	# both parts for one drift file, timed
+	start = time.time()
+	result = {"file" : filename}
+	try:
+		deltas = load_deltas(filename)
+		result["part1"] = sum(deltas)
+		result["part2"] = first_repeat(deltas)
+	except (IOError, ValueError) as err:
+		result["error"] = str(err)
+	result["seconds"] = time.time() - start
+	return result
+
+def expand_inputs(patterns):
+	# directories contribute every file in them, anything else is a glob
+	files = []
+	for pattern in patterns:
+		if os.path.isdir(pattern):
+			pattern = os.path.join(pattern, "*")
+		files.extend(f for f in sorted(glob.glob(pattern)) if os.path.isfile(f))
+	return files
+
+def batch(files, outfile, workers = None):
+	# spread files over a process pool, one JSON line per file
+	pool = multiprocessing.Pool(workers)
+	try:
+		for result in pool.imap_unordered(solve_file, files, 16):
+			outfile.write(json.dumps(result, sort_keys = True) + "\n")
+	finally:
+		pool.close()
+		pool.join()
+
 if __name__ == "__main__":
 
+	parser = argparse.ArgumentParser()
+	parser.add_argument("inputs", nargs = "*", help = "drift file directories or globs to run in batch")
+	parser.add_argument("-j", "--jobs", type = int, default = None, help = "worker processes (default: cpu count)")
+	parser.add_argument("-o", "--output", default = None, help = "JSON lines output file (default: stdout)")
+	args = parser.parse_args()
+	if args.inputs:
+		files = expand_inputs(args.inputs)
+		if args.output is None:
+			batch(files, sys.stdout, args.jobs)
+		else:
+			with open(args.output, "w") as outfile:
+				batch(files, outfile, args.jobs)
+		sys.exit(0)
+
 	#Part 1 solution
-	freq = 0
-	with open("day1_input", "r") as infile:
-		for line in infile.readlines():
-			freq += int(line.strip())
+	freq = sum(read_deltas("day1_input"))
 	print "Part 1 solution: " + str(freq)
 
 	#Part 2 solution
-	freq = 0
-	inputs = []
-	seen_set = set()
-	found = False
-	with open("day1_input", "r") as infile:
-		for line in infile.readlines():
-			inputs.append(int(line.strip()))
-	#loop inputs as ring buffer
-	while not found:
-		for item in inputs:
-			freq += item
-			if freq in seen_set:
-				print "Part 2 solution " + str(freq)
-				found = True
-				break;
-			else:
-				seen_set.add(freq)
-
-		
+	inputs = load_deltas("day1_input")
+	freq = first_repeat(inputs)
+	if freq is None:
+		print "Part 2 solution never repeats"
+	else:
+		print "Part 2 solution " + str(freq)
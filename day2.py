@@ -49,51 +49,146 @@ Although it hasn't changed, you can still get your puzzle input.
 
 """
 
-def editDist(str1, str2):
-	if len(str1) != len(str2):
-		print "Error: Input size must match."
-		exit()
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+CHECK_ROWS = 1 << 16 # IDs histogrammed per numpy pass
+
+def checksum(ids):
+	# product of IDs with some letter exactly twice and exactly thrice.
+	# Only a-z are counted; any other character is ignored by both paths.
+	if np is None or len(ids) == 0:
+		twos = 0
+		threes = 0
+		for box_id in ids:
+			freq_gram = [0] * 26
+			for char in box_id:
+				letter = ord(char) - 97
+				if 0 <= letter < 26:
+					freq_gram[letter] += 1
+			if 2 in freq_gram:
+				twos += 1
+			if 3 in freq_gram:
+				threes += 1
+		return twos * threes
+	# fixed width byte matrix, one row per ID, zero padded
+	width = max(len(box_id) for box_id in ids)
+	matrix = np.frombuffer(b"".join(box_id.ljust(width, "\0") for box_id in ids), dtype = np.uint8)
+	matrix = matrix.reshape(len(ids), width)
+	twos = 0
+	threes = 0
+	for top in range(0, len(ids), CHECK_ROWS):
+		rows = matrix[top:top+CHECK_ROWS].astype(np.int32) - 97
+		count = len(rows)
+		# padding and anything outside a-z lands in a 27th bin
+		rows[(rows < 0) | (rows > 25)] = 26
+		# one bincount over (row, letter) builds every histogram in the block
+		rows += 27 * np.arange(count, dtype = np.int32)[:, None]
+		hist = np.bincount(rows.ravel(), minlength = 27 * count).reshape(count, 27)[:, :26]
+		twos += int(np.count_nonzero((hist == 2).any(axis = 1)))
+		threes += int(np.count_nonzero((hist == 3).any(axis = 1)))
+	return twos * threes
+
+def near_pairs(ids):
+	# IDs one substitution apart agree once the differing position is
+	# masked out, so bucket every ID by each masked form in turn
+	unique = []
+	seen = set()
+	for box_id in ids:
+		if box_id not in seen:
+			seen.add(box_id)
+			unique.append(box_id)
+	pairs = [] # (id, id, common letters)
+	for i in range(max([len(box_id) for box_id in unique] + [0])):
+		buckets = {}
+		for box_id in unique:
+			if i < len(box_id):
+				buckets.setdefault(box_id[:i] + box_id[i+1:], []).append(box_id)
+		for key, bucket in buckets.items():
+			for a in range(len(bucket)):
+				for b in range(a+1, len(bucket)):
+					pairs.append((bucket[a], bucket[b], key))
+	return pairs
+
+def hamming(str1, str2, limit):
+	# mismatch count, or None as soon as it passes limit
 	dist = 0
-	for i in range(0, len(str1)):
+	for i in range(len(str1)):
 		if str1[i] != str2[i]:
 			dist += 1
+			if dist > limit:
+				return None
 	return dist
-	
-def min_str(str1, str2):
-	out = ''
-	for i in range(0, len(str1)):
-		if str1[i] == str2[i]:
-			out += str1[i]
-	return out	
+
+class MismatchIndex:
+	# IDs within k mismatches of each other must agree exactly on at
+	# least one of k+1 blocks (pigeonhole), so only IDs sharing a block
+	# are ever compared character by character
+
+	def __init__(self, ids, k):
+		self.k = k
+		self.ids = []
+		self.blocks = {} # (length, block number, block text) -> [id index]
+		for box_id in ids:
+			self.add(box_id)
+
+	def block_keys(self, box_id):
+		size = len(box_id)
+		parts = self.k + 1
+		keys = []
+		for b in range(parts):
+			lo = size * b // parts
+			hi = size * (b+1) // parts
+			keys.append((size, b, box_id[lo:hi]))
+		return keys
+
+	def add(self, box_id):
+		idx = len(self.ids)
+		self.ids.append(box_id)
+		for key in self.block_keys(box_id):
+			self.blocks.setdefault(key, []).append(idx)
+		return idx
+
+	def candidates(self, box_id):
+		found = set()
+		for key in self.block_keys(box_id):
+			found.update(self.blocks.get(key, []))
+		return found
+
+	def query(self, box_id):
+		# every indexed ID within k mismatches, as (id, distance)
+		matches = []
+		for idx in sorted(self.candidates(box_id)):
+			dist = hamming(box_id, self.ids[idx], self.k)
+			if dist is not None:
+				matches.append((self.ids[idx], dist))
+		return matches
+
+	def all_pairs(self):
+		# every indexed pair within k mismatches, as (id, id, distance)
+		pairs = []
+		for i in range(len(self.ids)):
+			for j in sorted(self.candidates(self.ids[i])):
+				if j <= i:
+					continue
+				dist = hamming(self.ids[i], self.ids[j], self.k)
+				if dist is not None:
+					pairs.append((self.ids[i], self.ids[j], dist))
+		return pairs
 
 if __name__ == "__main__":
 
 	#Part 1 solution
-	twos = 0
-	threes = 0
 	with open("day2_input", "r") as infile:
-		for line in infile.readlines():
-			freq_gram = [0] * 26
-			for char in line.strip():
-				freq_gram[ord(char)-97] += 1
-			if 2 in freq_gram:
-				twos += 1
-			if 3 in freq_gram:
-				threes += 1
-	print "Part 1 solution: " + str(twos * threes)
+		box_ids = [line.strip() for line in infile.readlines()]
+	print "Part 1 solution: " + str(checksum(box_ids))
 	
 	#Part 2 solution
 	all_lines = []
 	with open("day2_input", "r") as infile:
 		for line in infile.readlines():
 			all_lines.append(line.strip())
-	row_idx = 0
-	found = False
-	while row_idx < len(all_lines) and not found:
-		for line in all_lines:
-			if editDist(all_lines[row_idx], line) == 1:
-				#print line
-				#print all_lines[row_idx]
-				print min_str(line, all_lines[row_idx])
-				found = True
-		row_idx += 1
+	for pair in near_pairs(all_lines):
+		print pair[2]
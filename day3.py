@@ -57,6 +57,13 @@ What is the ID of the only claim that doesn't overlap?
 
 """
 
+from array import array
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
 def claim_parse(claim):
 	id, info = claim.split(" @ ")
 	coords, dims = info.split(": ")
@@ -64,41 +71,185 @@ def claim_parse(claim):
 	w, h = dims.split("x")
 	return (str(id),int(x),int(y),int(w),int(h))
 
+def coverage(claims):
+	# claims per square inch, from +1/-1 corners in a difference array
+	# recovered with a prefix sum pass along each axis
+	width = max([x+w for id_num,x,y,w,h in claims] + [0])
+	height = max([y+h for id_num,x,y,w,h in claims] + [0])
+	if np is not None:
+		diff = np.zeros((height+1, width+1), dtype = np.int32)
+		xs = np.array([c[1] for c in claims], dtype = np.intp)
+		ys = np.array([c[2] for c in claims], dtype = np.intp)
+		xe = xs + np.array([c[3] for c in claims], dtype = np.intp)
+		ye = ys + np.array([c[4] for c in claims], dtype = np.intp)
+		np.add.at(diff, (ys, xs), 1)
+		np.add.at(diff, (ys, xe), -1)
+		np.add.at(diff, (ye, xs), -1)
+		np.add.at(diff, (ye, xe), 1)
+		diff.cumsum(axis = 0, out = diff)
+		diff.cumsum(axis = 1, out = diff)
+		return diff[:height, :width]
+	diff = [array('i', [0]) * (width+1) for __ in xrange(height+1)]
+	for id_num,x,y,w,h in claims:
+		diff[y][x] += 1
+		diff[y][x+w] -= 1
+		diff[y+h][x] -= 1
+		diff[y+h][x+w] += 1
+	for j in xrange(1, height+1):
+		above = diff[j-1]
+		row = diff[j]
+		for i in xrange(width+1):
+			row[i] += above[i]
+	for row in diff:
+		for i in xrange(1, width+1):
+			row[i] += row[i-1]
+	return [row[:width] for row in diff[:height]]
+
+class CoverTree:
+	# segment tree over compressed y edges; each node tracks how many
+	# claims span it entirely and the length covered at least once/twice
+
+	def __init__(self, ys):
+		self.ys = ys # sorted distinct y edges
+		size = 4 * max(len(ys), 1)
+		self.count = [0] * size
+		self.once = [0] * size
+		self.twice = [0] * size
+
+	def update(self, lo, hi, delta, node = 1, l = 0, r = None):
+		# add delta over elementary slabs [lo, hi)
+		if r is None:
+			r = len(self.ys) - 1
+		if hi <= l or r <= lo:
+			return
+		if lo <= l and r <= hi:
+			self.count[node] += delta
+		else:
+			mid = (l + r) // 2
+			self.update(lo, hi, delta, 2*node, l, mid)
+			self.update(lo, hi, delta, 2*node+1, mid, r)
+		self.pull(node, l, r)
+
+	def pull(self, node, l, r):
+		full = self.ys[r] - self.ys[l]
+		leaf = r - l == 1
+		if self.count[node] >= 2:
+			self.once[node] = full
+			self.twice[node] = full
+		elif self.count[node] == 1:
+			self.once[node] = full
+			self.twice[node] = 0 if leaf else self.once[2*node] + self.once[2*node+1]
+		elif leaf:
+			self.once[node] = 0
+			self.twice[node] = 0
+		else:
+			self.once[node] = self.once[2*node] + self.once[2*node+1]
+			self.twice[node] = self.twice[2*node] + self.twice[2*node+1]
+
+def overlap_area(claims):
+	# area within two or more claims by sweeping x edges, independent of
+	# coordinate magnitude
+	events = []
+	edges = set()
+	for id_num,x,y,w,h in claims:
+		if w > 0 and h > 0:
+			events.append((x, 1, y, y+h))
+			events.append((x+w, -1, y, y+h))
+			edges.add(y)
+			edges.add(y+h)
+	if not events:
+		return 0
+	ys = sorted(edges)
+	slab = dict((y, i) for i, y in enumerate(ys))
+	tree = CoverTree(ys)
+	events.sort()
+	area = 0
+	last_x = events[0][0]
+	for x, delta, y1, y2 in events:
+		area += tree.twice[1] * (x - last_x)
+		last_x = x
+		tree.update(slab[y1], slab[y2], delta)
+	return area
+
+def count_overlaps(fabric):
+	# square inches within two or more claims
+	if np is not None:
+		return int(np.count_nonzero(fabric >= 2))
+	return sum(sum(1 for v in row if v >= 2) for row in fabric)
+
+def claims_overlap(a, b):
+	# share at least one square inch (empty claims share none)
+	if a[3] <= 0 or a[4] <= 0 or b[3] <= 0 or b[4] <= 0:
+		return False
+	return a[1] < b[1]+b[3] and b[1] < a[1]+a[3] and a[2] < b[2]+b[4] and b[2] < a[2]+a[4]
+
+MAX_CELLS = 64 # buckets one claim may fill before it is kept aside
+
+class ClaimIndex:
+	# uniform bucket grid over claim rectangles; cells are about one
+	# median claim across, so each claim is only tested against its
+	# neighbours.  Claims that would fill more than MAX_CELLS buckets are
+	# kept in a separate large list that every query checks directly.
+
+	def __init__(self, claims, cell = None):
+		self.claims = list(claims)
+		self.by_id = dict((claim[0], idx) for idx, claim in enumerate(self.claims))
+		if cell is None:
+			sizes = sorted(max(c[3], c[4]) for c in self.claims)
+			cell = max(sizes[len(sizes) // 2] if sizes else 1, 1)
+		self.cell = cell
+		self.buckets = {} # (cell x, cell y) -> [claim index]
+		self.large = [] # claim indexes kept out of the buckets
+		for idx, claim in enumerate(self.claims):
+			if self.cell_count(claim) > MAX_CELLS:
+				self.large.append(idx)
+				continue
+			for key in self.cells(claim):
+				self.buckets.setdefault(key, []).append(idx)
+		self.is_large = set(self.large)
+
+	def cell_span(self, claim):
+		id_num,x,y,w,h = claim
+		return (x // self.cell, (x+w-1) // self.cell + 1, y // self.cell, (y+h-1) // self.cell + 1)
+
+	def cell_count(self, claim):
+		if claim[3] <= 0 or claim[4] <= 0:
+			return 0
+		x0, x1, y0, y1 = self.cell_span(claim)
+		return (x1 - x0) * (y1 - y0)
+
+	def cells(self, claim):
+		if claim[3] <= 0 or claim[4] <= 0:
+			return []
+		x0, x1, y0, y1 = self.cell_span(claim)
+		return [(i, j) for i in xrange(x0, x1) for j in xrange(y0, y1)]
+
+	def overlapping(self, id_num):
+		# ids of every other claim sharing a square inch with id_num
+		idx = self.by_id[id_num]
+		claim = self.claims[idx]
+		if idx in self.is_large:
+			# too big to walk its buckets, test every claim
+			candidates = xrange(len(self.claims))
+		else:
+			candidates = set(self.large)
+			for key in self.cells(claim):
+				candidates.update(self.buckets[key])
+		found = [other for other in candidates if other != idx and claims_overlap(claim, self.claims[other])]
+		return [self.claims[other][0] for other in sorted(found)]
+
+	def intact(self):
+		# ids of every claim that overlaps no other claim
+		return [claim[0] for claim in self.claims if not self.overlapping(claim[0])]
 
 if __name__ == "__main__":
 	#Part 1 Solution
-	#fabric is 1000x1000 inches.  Each sq inch holds a set of claims.
-	fab_size = 1000
-	fabric = []
-	for i in xrange(fab_size):
-		fabric.append([ set() for __ in xrange(fab_size)])
-	#fabric = [ [ '' ] * fab_size for i in range(fab_size) ]
 	claims = []
-	overlaps = 0
 	with open("day3_input", "r") as infile:
 		for line in infile.readlines():
-			claims.append(line.strip())
-	for claim in claims:
-		id_num,x,y,w,h = claim_parse(claim)
-		for i in range(x,x+w):
-			for j in range(y,y+h):
-				#fabric[j][i] = fabric[j][i] + id_num + " "
-				fabric[j][i].add(id_num)
-	for i in range(fab_size):
-		for j in range(fab_size):
-			#if len(fabric[j][i].strip().split(" ")) > 1:
-			if len(fabric[j][i]) > 1:
-				overlaps += 1
-	print "Part 1 solution " + str(overlaps)
+			claims.append(claim_parse(line.strip()))
+	fabric = coverage(claims)
+	print "Part 1 solution " + str(count_overlaps(fabric))
 
 	#Part 2 Solution
-	for claim in claims:
-		valid = True
-		id_num,x,y,w,h = claim_parse(claim)
-		for i in range(x,x+w):
-			for j in range(y,y+h):
-				if len(fabric[j][i]) != 1:
-					valid = False
-		if valid == True:
-			print "Part 2 solution " + id_num
-
+	print "Part 2 solution " + " ".join(ClaimIndex(claims).intact())
@@ -1,7 +1,8 @@
 #!/usr/bin/python
 
-import time
+import heapq
 import re
+from array import array
 
 """
 --- Day 4: Repose Record ---
@@ -67,35 +68,143 @@ What is the ID of the guard you chose multiplied by the minute you chose? (In th
 
 """
 
+def timestamp_key(line):
+	# fixed width "YYYY-MM-DD HH:MM" orders the same as the time it names
+	return line[1:17]
+
+def read_log(filename):
+	with open(filename, "r") as infile:
+		for line in infile:
+			line = line.strip()
+			if line:
+				yield line
+
+def order_log(lines):
+	# Order events by timestamp
+	return sorted(lines, key = timestamp_key)
+
+def merge_logs(streams):
+	# linear merge of logs that are each already in timestamp order
+	keyed = [((timestamp_key(line), line) for line in stream) for stream in streams]
+	return [line for key, line in heapq.merge(*keyed)]
+
+def parse_event(line):
+	# "[1518-11-01 00:05] falls asleep" -> (minute, event, guard id)
+	minute = int(line[15:17])
+	if "Guard" in line: # Shift change
+		return (minute, "shift", re.search("\d+", line[18:]).group(0))
+	elif "asleep" in line: # Got sleepy
+		return (minute, "asleep", None)
+	return (minute, "wakes", None)
+
+def sleep_minutes(log):
+	# per guard 60 minute histogram of time asleep, built from +1/-1
+	# range marks per nap and one prefix sum per guard at the end
+	diffs = {}
+	g_id = None
+	slept = None # minute guard went to sleep
+	for line in log:
+		minute, event, shift_id = parse_event(line)
+		if event == "shift":
+			g_id = shift_id
+		elif event == "asleep":
+			slept = minute
+		else:
+			if g_id not in diffs:
+				diffs[g_id] = array('i', [0]) * 61
+			diffs[g_id][slept] += 1
+			diffs[g_id][minute] -= 1
+	guards = {}
+	for g_id, diff in diffs.items():
+		mins = array('i', [0]) * 60
+		asleep = 0
+		for i in range(60):
+			asleep += diff[i]
+			mins[i] = asleep
+		guards[g_id] = mins
+	return guards
+
+class GuardLog:
+	# long lived guard sleep store fed one log line at a time.  Lines may
+	# arrive out of order by up to `window` events; they wait in a heap
+	# and are applied in timestamp order once the window is full.
+	# Queries cover applied events only, flush() applies the rest.
+
+	def __init__(self, window = 0):
+		self.window = window
+		self.pending = [] # heap of (timestamp, arrival, line)
+		self.arrivals = 0
+		self.applied = None # timestamp of last applied event
+		self.g_id = None # guard on shift
+		self.slept = None # minute guard went to sleep
+		self.mins = {} # guard id -> 60 minute histogram
+		self.totals = {} # guard id -> minutes asleep
+		self.best = {} # guard id -> (times asleep, minute) of top minute
+
+	def add(self, line):
+		key = timestamp_key(line)
+		if self.applied is not None and key < self.applied:
+			raise ValueError("event outside reorder window: " + line)
+		heapq.heappush(self.pending, (key, self.arrivals, line))
+		self.arrivals += 1
+		while len(self.pending) > self.window:
+			self.apply(heapq.heappop(self.pending))
+
+	def extend(self, lines):
+		for line in lines:
+			self.add(line)
+
+	def flush(self):
+		while self.pending:
+			self.apply(heapq.heappop(self.pending))
+
+	def apply(self, item):
+		key, arrival, line = item
+		self.applied = key
+		minute, event, shift_id = parse_event(line)
+		if event == "shift":
+			self.g_id = shift_id
+		elif event == "asleep":
+			self.slept = minute
+		else:
+			if self.g_id not in self.mins:
+				self.mins[self.g_id] = array('i', [0]) * 60
+				self.totals[self.g_id] = 0
+				self.best[self.g_id] = (0, 0)
+			mins = self.mins[self.g_id]
+			best = self.best[self.g_id]
+			for i in range(self.slept, minute):
+				mins[i] += 1
+				if (mins[i], -i) > (best[0], -best[1]):
+					best = (mins[i], i)
+			self.best[self.g_id] = best
+			self.totals[self.g_id] += minute - self.slept
+
+	def sleepiest(self):
+		# (guard id, minutes asleep, minute most often asleep)
+		g_id = max(self.totals, key = lambda g : self.totals[g])
+		return (g_id, self.totals[g_id], self.best[g_id][1])
+
+	def most_consistent(self):
+		# (guard id, minute, times asleep on that minute)
+		g_id = max(self.best, key = lambda g : self.best[g][0])
+		return (g_id, self.best[g_id][1], self.best[g_id][0])
+
+	def guard(self, g_id):
+		# (minutes asleep, copy of 60 minute histogram) for one guard
+		if g_id not in self.mins:
+			return (0, array('i', [0]) * 60)
+		return (self.totals[g_id], array('i', self.mins[g_id]))
+
 if __name__ == "__main__":
 	#Part 1 Solution
 	
-	log = [] # problem input
-	with open("day4_input", "r") as infile:
-		for line in infile.readlines():
-			log.append(line.strip())
-	# Order events by timestamp
-	log.sort(key = lambda x : time.mktime(time.strptime("2001-" + x[6:17], "%Y-%m-%d %H:%M")))
+	log = order_log(read_log("day4_input")) # problem input
 	
-	slept = None # time guard went to sleep
-	guards = {}
-	for event in log:
-		e_time = time.mktime(time.strptime("2001-" + event[6:17], "%Y-%m-%d %H:%M"))
-		if "Guard" in event: # Shift change
-			g_id = re.search("\d+", event[18:]).group(0) # Pull numerical ID
-		elif "asleep" in event: # Got sleepy
-			slept = e_time
-		elif "wakes" in event: # Woke up
-			if g_id in guards.keys():
-				guards[g_id].append((slept, e_time)) # tuple of time went to sleep, and time woke up
-			else:
-				guards[g_id] = [(slept, e_time)]
-				
+	guards = sleep_minutes(log)
 	totals = []
 	for guard in guards.keys():
-		slept = 0 #total time slept by each guard
-		for event in guards[guard]:
-			slept += (event[1] - event[0])/60 # convert to mins
+		slept = sum(guards[guard]) #total time slept by each guard
 		print "Guard " + str(guard) + " slept for " + str(slept) + " mins."
 		totals.append((guard, slept))
 	
@@ -103,19 +212,13 @@ if __name__ == "__main__":
 	sleepy_id = totals[0][0] # find most sleepy guard
 	print "Most sleepy guard " + str(sleepy_id)
 	
-	mins = [0] * 60
-	for event in guards[sleepy_id]: # review log for sleepy guard
-		for i in range(time.gmtime(int(event[0]))[4], time.gmtime(int(event[1]))[4]): #minute to minute
-			mins[i] += 1	
+	mins = guards[sleepy_id]
 	print mins.index(max(mins)) * int(sleepy_id) #minute most spent asleep multiplied by guard id
 	
 	#Part 2 Solution
 	mins_slept = [] #(Guard ID, Max Mins, Minute Most Slept)
 	for guard in guards.keys():
-		mins = [0] * 60
-		for event in guards[guard]:
-			for i in range(time.gmtime(int(event[0]))[4], time.gmtime(int(event[1]))[4]): #minute to minute
-				mins[i] += 1
+		mins = guards[guard]
 		mins_slept.append((guard, max(mins), mins.index(max(mins))))
 	
 	mins_slept.sort(key = lambda x : x[1], reverse = True)
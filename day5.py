@@ -48,42 +48,106 @@ Although it hasn't changed, you can still get your puzzle input.
 
 """
 
-def react(string):
-	# reaction between 'Aa' or 'aA' forms for a-z/A-Z
-	for i in range(65,91): # upper ascii
-		string = string.replace(chr(i).lower()+chr(i), '')
-		string = string.replace(chr(i)+chr(i).lower(), '')
-	return string
+import multiprocessing
+
+def react(polymer):
+	# single pass reduction: units stream through a bytearray used as a
+	# stack, and a unit cancels the top of the stack when the two are
+	# the same letter in opposite case (ascii codes differ only by 32;
+	# other characters such as '@' and '`' differ by 32 too, so the unit
+	# must also be a letter)
+	stack = bytearray()
+	for unit in bytearray(polymer):
+		if stack and stack[-1] ^ unit == 32 and 97 <= (unit | 32) <= 122:
+			stack.pop()
+		else:
+			stack.append(unit)
+	return str(stack)
+
+def trial_length(args):
+	# reduced length once every unit of one type is removed
+	polymer, unit = args
+	return len(react(polymer.translate(None, unit + unit.lower())))
+
+def removal_lengths(polymer, workers = None):
+	# reduced length for each unit type removed, keyed 'A'-'Z'.  Removing
+	# a type commutes with reacting, so callers may pass the already
+	# reduced polymer.  workers > 1 runs the trials in a process pool.
+	units = [chr(i) for i in range(65,91)] # upper ascii
+	trials = [(polymer, unit) for unit in units]
+	if workers is not None and workers > 1:
+		pool = multiprocessing.Pool(workers)
+		try:
+			lengths = pool.map(trial_length, trials)
+		finally:
+			pool.close()
+			pool.join()
+	else:
+		lengths = [trial_length(trial) for trial in trials]
+	return dict(zip(units, lengths))
+
+CHUNK_SIZE = 1 << 22 # bytes of polymer reduced at a time
+
+def merge_residues(left, right):
+	# a reduced chunk only has units left that react across its edges,
+	# so two neighbours merge by cancelling where they meet (letters
+	# only, as in react)
+	i = 0
+	while left and i < len(right) and left[-1] ^ ord(right[i]) == 32 and 97 <= (left[-1] | 32) <= 122:
+		left.pop()
+		i += 1
+	left.extend(right[i:])
+	return left
+
+def read_chunks(filename, chunk_size = CHUNK_SIZE):
+	with open(filename, "rb") as infile:
+		while True:
+			chunk = infile.read(chunk_size)
+			if not chunk:
+				break
+			yield chunk.translate(None, " \t\r\n")
+
+def reduce_file(filename, chunk_size = CHUNK_SIZE, workers = None, out_name = None):
+	# reduce a polymer too large to hold unreacted, chunk by chunk (in a
+	# process pool when workers > 1), merging residues in file order.
+	# Returns the final length, optionally writing the polymer out.
+	pool = None
+	if workers is not None and workers > 1:
+		pool = multiprocessing.Pool(workers)
+	try:
+		if pool is None:
+			residues = (react(chunk) for chunk in read_chunks(filename, chunk_size))
+		else:
+			residues = pool.imap(react, read_chunks(filename, chunk_size))
+		polymer = bytearray()
+		for residue in residues:
+			merge_residues(polymer, residue)
+	finally:
+		if pool is not None:
+			pool.close()
+			pool.join()
+	if out_name is not None:
+		with open(out_name, "wb") as outfile:
+			outfile.write(polymer)
+	return len(polymer)
 
 if __name__ == "__main__":
 	# Part 1 Solution
 
-	orig_input = ''
 	polystring = ''
 	with open("day5_input", "r") as infile:
 		polystring = infile.read().strip()
-	orig_input = polystring # save for Part #2
-	
-	last_ver = ''
-	while last_ver != polystring:
-		last_ver = polystring
-		polystring = react(polystring)
+	polystring = react(polystring)
 
 	print "Remaining units: " + str(len(polystring))
 
 	#Part 2 Solution
 	
-	lengths = [len(orig_input)] * 26
-	for i in range(65,91): # upper ascii
-		trialstr = orig_input.replace(chr(i), '')
-		trialstr = trialstr.replace(chr(i).lower(), '')
-		last_ver = ''
-		while last_ver != trialstr:
-			last_ver = trialstr
-			trialstr = react(trialstr)
-		lengths[i-65] = len(trialstr)
+	# start every trial from the part 1 result rather than the raw input
+	lengths = removal_lengths(polystring)
+	best = min(sorted(lengths), key = lambda unit : lengths[unit]) # first letter on ties
 	
-	print "Remove polymer " + str(chr(65+lengths.index(min(lengths))))
-	print "Min length is " + str(min(lengths))
+	print "Remove polymer " + best
+	print "Min length is " + str(lengths[best])
 
 	
@@ -91,6 +91,15 @@ What is the size of the region containing all locations which have a total dista
 
 """
 
+from array import array
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+BLOCK_BYTES = 1 << 24 # size of the distance block built per numpy pass
+
 class Point:
 	
 	def __init__(self, x, y):
@@ -98,11 +107,140 @@ class Point:
 		self.y = int(y)
 		self.is_inf = False # is an outer boundry, and won't count
 		self.score = 0 # for counting area
-		
-	def mh_dist(self, pt):
-		return abs(self.x - pt.x) + abs(self.y - pt.y)
 
 
+def nearest_sites(points, minx, maxx, miny, maxy):
+	# label each cell of the box [minx, maxx] x [miny, maxy] with the index
+	# of its closest point (-1 where two or more tie), indexed
+	# [y - miny][x - minx].  Labels are int16, or int32 once there are
+	# too many points for int16 to hold every index.
+	width = maxx - minx + 1
+	height = maxy - miny + 1
+	wide = len(points) >= 32768
+	if np is not None:
+		dtype = np.int32 if wide else np.int16
+		px = np.array([p.x for p in points], dtype = np.int32)
+		py = np.array([p.y for p in points], dtype = np.int32)
+		# x distances are the same on every row, so compute them once
+		dx = np.abs(px[:, None] - np.arange(minx, maxx + 1, dtype = np.int32)[None, :])[:, None, :]
+		# rows per pass so one site x row x column int32 block fits BLOCK_BYTES
+		block_rows = max(1, BLOCK_BYTES // (len(points) * width * 4))
+		labels = np.empty((height, width), dtype = dtype)
+		for top in range(0, height, block_rows):
+			rows = min(block_rows, height - top)
+			ys = np.arange(miny + top, miny + top + rows, dtype = np.int32)
+			dist = dx + np.abs(py[:, None] - ys[None, :])[:, :, None] # site x row x column
+			closest = dist.min(axis = 0)
+			block = dist.argmin(axis = 0).astype(dtype)
+			block[(dist == closest).sum(axis = 0) > 1] = -1
+			labels[top:top+rows] = block
+		return labels
+	# multi-source BFS: on an open grid, BFS steps are manhattan distance,
+	# and a cell is tied when neighbours with different owners reach it
+	# at the same distance
+	label = array('i' if wide else 'h', [-1]) * (width * height)
+	dist = array('i', [-1]) * (width * height)
+	frontier = []
+	for idx, point in enumerate(points):
+		cell = (point.y - miny) * width + (point.x - minx)
+		if dist[cell] == 0: # two points on one cell
+			label[cell] = -1
+		else:
+			dist[cell] = 0
+			label[cell] = idx
+			frontier.append(cell)
+	d = 0
+	while frontier:
+		d += 1
+		next_frontier = []
+		for cell in frontier:
+			owner = label[cell]
+			x = cell % width
+			neighbours = []
+			if x > 0:
+				neighbours.append(cell - 1)
+			if x < width - 1:
+				neighbours.append(cell + 1)
+			if cell >= width:
+				neighbours.append(cell - width)
+			if cell < width * (height - 1):
+				neighbours.append(cell + width)
+			for n in neighbours:
+				if dist[n] == -1:
+					dist[n] = d
+					label[n] = owner
+					next_frontier.append(n)
+				elif dist[n] == d and label[n] != owner:
+					label[n] = -1
+		frontier = next_frontier
+	return [label[j*width:(j+1)*width] for j in range(height)]
+
+def region_areas(labels, count):
+	# number of cells owned by each point index
+	if np is not None:
+		return [int(a) for a in np.bincount(labels[labels >= 0].ravel(), minlength = count)]
+	areas = [0] * count
+	for row in labels:
+		for owner in row:
+			if owner >= 0:
+				areas[owner] += 1
+	return areas
+
+def infinite_sites(labels):
+	# a point owning any cell on the border ring keeps winning every cell
+	# straight outward from it, so its area is unbounded
+	ring = set()
+	if np is not None:
+		for edge in (labels[0], labels[-1], labels[:, 0], labels[:, -1]):
+			ring.update(int(owner) for owner in np.unique(edge))
+	else:
+		ring.update(labels[0])
+		ring.update(labels[-1])
+		for row in labels:
+			ring.add(row[0])
+			ring.add(row[-1])
+	ring.discard(-1)
+	return ring
+
+def axis_sums(coords, lo, hi):
+	# sum of distances from every coordinate to each of lo..hi, walked
+	# in one pass: each step right adds one per coordinate passed and
+	# removes one per coordinate still ahead
+	coords = sorted(coords)
+	sums = array('l', [0]) * (hi - lo + 1)
+	total = sum(c - lo for c in coords)
+	passed = 0
+	for i in range(hi - lo + 1):
+		while passed < len(coords) and coords[passed] <= lo + i - 1:
+			passed += 1
+		if i > 0:
+			total += passed - (len(coords) - passed)
+		sums[i] = total
+	return sums
+
+def safe_area(points, threshold = 10000):
+	# cells whose total distance to every point is under threshold.  The
+	# sum separates into an x part and a y part, and past the outermost
+	# points each part grows by len(points) per step, which bounds how
+	# far the region can reach outside the bounding box.
+	if not points or threshold <= 0:
+		return 0
+	reach = threshold // len(points) + 1
+	xs = [p.x for p in points]
+	ys = [p.y for p in points]
+	sx = sorted(axis_sums(xs, min(xs) - reach, max(xs) + reach))
+	sy = sorted(axis_sums(ys, min(ys) - reach, max(ys) + reach))
+	# two pointer sweep: as sx rises, fewer sy values still fit
+	area = 0
+	j = len(sy)
+	for x_sum in sx:
+		while j > 0 and x_sum + sy[j-1] >= threshold:
+			j -= 1
+		if j == 0:
+			break
+		area += j
+	return area
+
 if __name__ == "__main__":
 
 	#Part 1 Solution
@@ -123,65 +261,25 @@ if __name__ == "__main__":
 	maxx = max(xcords)
 	miny = min(ycords)
 	maxy = max(ycords)
-	for point in points:
-		# exclude all that lie on boundary
-		if point.x == minx or point.x == maxx or point.y == miny or point.y == maxy:
-			point.is_inf = True
-
-	# build a 2D grid to contain all available points
-	grid = [[None] * maxx for i in range(maxy)]
-		
-	for i in range(minx, maxx):
-		for j in range(miny, maxy):
-			ranges = []
-			for point in points:
-				# find each grid point's distance from set of all points
-				ranges.append((point.mh_dist(Point(i, j)), point))
-			ranges.sort(key = lambda x : x[0]) # locate closest point
-			if ranges[0][0] == ranges[1][0]: # equal distant to two points
-				grid[j][i] = None
-			else:
-				grid[j][i] = ranges[0][1] # assign closest point
-				
+
+	# label every cell with its closest point, and total up the areas
+	labels = nearest_sites(points, minx, maxx, miny, maxy)
+	for idx in infinite_sites(labels):
+		# exclude all that reach the boundary
+		points[idx].is_inf = True
+	areas = region_areas(labels, len(points))
+	for point, area in zip(points, areas):
+		point.score = area
 
 	# find point that owns the most grid area
-	max_score = 0
 	best_point = None
-	for i in range(minx, maxx):
-		for j in range(miny, maxy):
-			if grid[j][i] is not None:
-				if grid[j][i].is_inf == False:
-					grid[j][i].score += 1
-					if grid[j][i].score > max_score:
-						max_score = grid[j][i].score
-						best_point = grid[j][i]
+	for point in points:
+		if point.is_inf == False:
+			if best_point is None or point.score > best_point.score:
+				best_point = point
 	
 	print best_point.score
 	
 	# Part 2 Solution
 	
-	# build a 2D grid to contain all available points
-	grid = [[None] * maxx for i in range(maxy)]
-		
-	for i in range(minx, maxx):
-		for j in range(miny, maxy):
-			total_dist = 0
-			for point in points:
-				# sum each grid point's distance from set of all points
-				total_dist += point.mh_dist(Point(i, j))
-			if total_dist < 10000: # count as in range
-				grid[j][i] = 1
-			else:
-				grid[j][i] = 0
-	
-	safe_area = 0
-	for i in range(minx, maxx):
-		for j in range(miny, maxy):
-			safe_area += grid[j][i]
-			
-	print safe_area
-	
-
-
-
-		
+	print safe_area(points, 10000)
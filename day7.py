@@ -79,31 +79,13 @@ With 5 workers and the 60+ second step durations described above, how long will
 
 """
 
-class Node:
-	
-	def __init__(self, name):
-		self.name = name
-		self.prerequisites = set()
-		self.starttime = None
-		self.complete = False
-		self.elapsed = 0
-		
-	def add_prereq(self, requirement):
-		self.prerequisites.add(requirement)
-	
-	def task_time(self):
-		# ascii 'A' is decimal 65
-		# one minute + character time
-		return 60 + ord(self.name) - 64
-		
-	def start(self, time):
-		self.starttime = time
-
-	def tick(self):
-		self.elapsed += 1
-		if self.elapsed >= self.task_time():
-			self.complete = True
-	
+import heapq
+
+def task_time(step, base = 60):
+	# ascii 'A' is decimal 65
+	# base time + character time
+	return base + ord(step) - 64
+
 def parse_node(line):
 	line = line.replace("Step ", '')
 	line = line.replace("must be finished before step ", '')
@@ -113,112 +95,134 @@ def parse_node(line):
 	child = child.strip()
 	return (parent, child)
 
+def build_graph(deps):
+	# adjacency lists and prerequisite counts from (parent, child) pairs
+	children = {}
+	in_degree = {}
+	for parent, child in deps:
+		children.setdefault(parent, []).append(child)
+		children.setdefault(child, [])
+		in_degree[child] = in_degree.get(child, 0) + 1
+		in_degree.setdefault(parent, 0)
+	return children, in_degree
+
+def step_order(deps):
+	# Kahn's algorithm, taking the alphabetically first ready step each
+	# time from a min-heap
+	children, in_degree = build_graph(deps)
+	ready = [step for step in in_degree if in_degree[step] == 0]
+	heapq.heapify(ready)
+	order = []
+	while ready:
+		step = heapq.heappop(ready)
+		order.append(step)
+		for child in children[step]:
+			in_degree[child] -= 1
+			if in_degree[child] == 0:
+				heapq.heappush(ready, child)
+	if len(order) != len(in_degree):
+		raise ValueError("step dependencies contain a cycle")
+	return order
+
+def simulate(deps, workers = 5, base = 60, duration = task_time):
+	# discrete event simulation of the workers.  Time jumps straight to
+	# the next completion; steps freed by it go to the lowest numbered
+	# idle workers in alphabetical order.  Returns the total time and
+	# each worker's busy fraction.
+	children, in_degree = build_graph(deps)
+	ready = [step for step in in_degree if in_degree[step] == 0]
+	heapq.heapify(ready)
+	idle = range(workers)
+	busy = [0] * workers
+	events = [] # (completion time, worker, step)
+	wall_time = 0
+	while True:
+		while ready and idle:
+			step = heapq.heappop(ready)
+			worker = heapq.heappop(idle)
+			length = duration(step, base)
+			busy[worker] += length
+			heapq.heappush(events, (wall_time + length, worker, step))
+		if not events:
+			break
+		wall_time = events[0][0]
+		while events and events[0][0] == wall_time:
+			finished, worker, step = heapq.heappop(events)
+			heapq.heappush(idle, worker)
+			for child in children[step]:
+				in_degree[child] -= 1
+				if in_degree[child] == 0:
+					heapq.heappush(ready, child)
+	if any(in_degree[step] > 0 for step in in_degree):
+		raise ValueError("step dependencies contain a cycle")
+	utilization = [float(b) / wall_time if wall_time else 0.0 for b in busy]
+	return wall_time, utilization
+
+class CriticalPath:
+	# earliest/latest starts and slack of every step with unlimited
+	# workers, found with one forward and one backward pass over a
+	# topological order
+
+	def __init__(self, deps, base = 60, duration = task_time):
+		children, in_degree = build_graph(deps)
+		self.duration = dict((step, duration(step, base)) for step in in_degree)
+		parents = dict((step, []) for step in in_degree)
+		for step in children:
+			for child in children[step]:
+				parents[child].append(step)
+		order = []
+		stack = [step for step in in_degree if in_degree[step] == 0]
+		while stack:
+			step = stack.pop()
+			order.append(step)
+			for child in children[step]:
+				in_degree[child] -= 1
+				if in_degree[child] == 0:
+					stack.append(child)
+		if len(order) != len(in_degree):
+			raise ValueError("step dependencies contain a cycle")
+		self.earliest = {}
+		for step in order:
+			self.earliest[step] = max([self.earliest[p] + self.duration[p] for p in parents[step]] + [0])
+		self.length = max([self.earliest[s] + self.duration[s] for s in order] + [0])
+		self.latest = {}
+		for step in reversed(order):
+			finish = min([self.latest[c] for c in children[step]] + [self.length])
+			self.latest[step] = finish - self.duration[step]
+		self.slack = dict((step, self.latest[step] - self.earliest[step]) for step in order)
+		self.work = sum(self.duration.values())
+		# follow zero slack steps that start as their parent finishes
+		self.path = []
+		step = min([s for s in order if not parents[s] and self.slack[s] == 0] or [None])
+		while step is not None:
+			self.path.append(step)
+			end = self.earliest[step] + self.duration[step]
+			step = min([c for c in children[step] if self.slack[c] == 0 and self.earliest[c] == end] or [None])
+
+	def lower_bound(self, workers):
+		# no schedule beats the critical path or the work split evenly
+		return max(self.length, -(-self.work // workers))
+
 if __name__ == "__main__":
 
 	#Part 1 Solution
 	
-	all_step_names = set()
 	deps = []
-	all_steps = []	
-	
 	with open("day7_input", "r") as infile:
 		for line in infile.readlines():
-			p, c = parse_node(line.strip())
-			# find set of all steps to complete
-			all_step_names.add(p)
-			all_step_names.add(c)
 			# all prerequisite relationships
-			deps.append((p, c))
-	
-	while len(all_step_names) != 0:
-		all_steps.append(Node(all_step_names.pop()))
+			deps.append(parse_node(line.strip()))
 	
-	# map all prerequisite dependancies to step names
-	for dep in deps:
-		for step in all_steps:
-			if step.name == dep[1]:
-				step.prerequisites.add(dep[0])
-	
-	# place in alphabetical order
-	all_steps.sort(key = lambda x : x.name)
-	
-	seq = ''
-	while len(all_steps) != 0:
-		rmv = None
-		for step in all_steps:
-			# find job available to start (in alphabetical order)
-			if len(step.prerequisites) == 0:
-				seq += step.name
-				rmv = step
-				break
-		for step in all_steps:
-			# prerequisites now met for job completed
-			if rmv.name in step.prerequisites:
-				step.prerequisites.remove(rmv.name)
-		# remove step from listing
-		all_steps.remove(rmv)
-		
-	print seq
+	print "".join(step_order(deps))
 	
 	# Part 2 Solution
 	
-	all_step_names = set()
-	deps = []
-	all_steps = []	
-	
-	with open("day7_input", "r") as infile:
-		for line in infile.readlines():
-			p, c = parse_node(line.strip())
-			# find set of all steps to complete
-			all_step_names.add(p)
-			all_step_names.add(c)
-			# all prerequisite relationships
-			deps.append((p, c))
-	
-	while len(all_step_names) != 0:
-		all_steps.append(Node(all_step_names.pop()))
-	
-	# map all prerequisite dependancies to step names
-	for dep in deps:
-		for step in all_steps:
-			if step.name == dep[1]:
-				step.prerequisites.add(dep[0])
-	
-	# place in alphabetical order
-	all_steps.sort(key = lambda x : x.name)
-	
-	wall_time = 0
-	in_work = [None] * 5 # 5 concurrent jobs max
-	while len(all_steps) != 0:
-		for i in range(len(in_work)):
-			if in_work[i] != None: # job in progress
-				if in_work[i].complete:
-					# print "Finished " + in_work[i].name
-					# job is done, so prerequisites are satisified
-					for step in all_steps:
-						if in_work[i].name in step.prerequisites:
-							step.prerequisites.remove(in_work[i].name)
-					# remove job from work queue
-					all_steps.remove(in_work[i])
-					in_work[i] = None # worker is now available
-
-		for step in all_steps:
-			# job can be started
-			if len(step.prerequisites) == 0 and step.starttime == None:
-				for i in range(len(in_work)):
-					# available worker starts the task
-					if in_work[i] == None:
-						in_work[i] = step
-						in_work[i].start(wall_time)
-						break
-						
-		# time pases on all jobs
-		for job in in_work:
-			if job != None:
-				job.tick()
-		wall_time += 1
-		
-	print wall_time-1
-	
-	
+	wall_time, utilization = simulate(deps, 5, 60) # 5 concurrent jobs max
+	print wall_time
+	for worker, share in enumerate(utilization):
+		print "Worker " + str(worker) + " busy " + str(round(share * 100, 1)) + "%"
 	
+	critical = CriticalPath(deps, 60)
+	print "Critical path " + "".join(critical.path) + " takes " + str(critical.length)
+	for workers in range(1, 6):
+		print str(workers) + " workers need at least " + str(critical.lower_bound(workers))
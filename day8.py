@@ -59,6 +59,8 @@ What is the value of the root node?
 
 """
 
+from array import array
+
 class Node:
 
 	def __init__(self):
@@ -66,68 +68,197 @@ class Node:
 		self.c_size = 0
 		self.metadata = []
 		self.children = []
+		self.total = None # cached sum_meta
+		self.value = None # cached sum_meta2
 	
 	def add_meta(self, data):
 		self.metadata.append(data)
 		self.m_size = len(self.metadata)
+		self.total = self.value = None
 	
 	def add_child(self, child):
 		self.children.append(child)
 		self.c_size = len(self.children)
+		self.total = self.value = None
 	
-	def sum_meta(self):
+	def close(self):
+		# compute and cache both sums from the children's cached sums;
+		# parse_node calls this as each node's metadata is read
 		sum = 0
-		for child in self.children:
-			sum += child.sum_meta();
 		for entry in self.metadata:
 			sum += entry
-		return sum
-		
-	def sum_meta2(self):
-		sum = 0
-		# if no children, return sum of metadata entries
+		# if no children, value is sum of metadata entries
 		if self.c_size == 0:
-			for entry in self.metadata:
-				sum += entry
-			return sum
-		# return sum of child node metadata.  
+			self.value = sum
+		# value is sum of child node values.  
 		# own metadata acts as index to child nodes to sum
 		else:
+			self.value = 0
 			for idx in self.metadata:
 				# exclude out of range nodes
-				if(idx-1 < self.c_size):
-					sum += self.children[idx-1].sum_meta2()
-			return sum
-
-def parse_node(root, stream):
-	if len(stream) == 0:
-		return stream
-	num_nodes = stream[0]
-	num_meta  = stream[1]
-	stream    = stream[2:]
-	
-	for i in range(num_nodes):
-		root.add_child(Node())
-		stream = parse_node(root.children[i], stream)
-	
-	for i in range(num_meta):
-		root.add_meta(stream[0])
-		stream = stream[1:]
+				if 0 < idx <= self.c_size:
+					self.value += self.children[idx-1].sum_meta2()
+		for child in self.children:
+			sum += child.sum_meta()
+		self.total = sum
 	
-	return stream
+	def sum_meta(self):
+		if self.total is None:
+			self.close()
+		return self.total
+		
+	def sum_meta2(self):
+		if self.value is None:
+			self.close()
+		return self.value
+
+def parse_node(root, stream, pos = 0):
+	# fill root from the node starting at stream[pos] and return the
+	# position just past it.  An explicit stack of open nodes replaces
+	# recursion, and the cursor moves instead of slicing the stream.
+	if pos >= len(stream):
+		return pos
+	stack = [[root, stream[pos], stream[pos+1]]] # node, children left, num_meta
+	pos += 2
+	while stack:
+		top = stack[-1]
+		if top[1] > 0: # next child header
+			top[1] -= 1
+			child = Node()
+			top[0].add_child(child)
+			stack.append([child, stream[pos], stream[pos+1]])
+			pos += 2
+		else: # all children read, metadata follows
+			node = top[0]
+			for i in range(top[2]):
+				node.add_meta(stream[pos+i])
+			pos += top[2]
+			node.close()
+			stack.pop()
+	return pos
 	
 	
 
+def node_value(metadata, child_values):
+	# value of a node from its metadata and its children's values
+	if len(child_values) == 0:
+		return sum(metadata)
+	value = 0
+	for idx in metadata:
+		if 0 < idx <= len(child_values):
+			value += child_values[idx-1]
+	return value
+
+class LicenseTree:
+	# struct of arrays tree: node i's children are
+	# child_ids[child_offset[i] : child_offset[i] + child_count[i]] and its
+	# metadata is stream[meta_offset[i] : meta_offset[i] + meta_count[i]].
+	# Node 0 is the root; sums are filled in as each node closes.
+
+	def __init__(self, stream):
+		self.stream = stream
+		self.child_offset = array('i')
+		self.child_count = array('i')
+		self.meta_offset = array('i')
+		self.meta_count = array('i')
+		self.child_ids = array('i')
+		self.totals = array('l')
+		self.values = array('l')
+		if len(stream) == 0:
+			return
+		stack = [[self.new_node(0), stream[0], []]] # node, children left, child ids
+		pos = 2
+		while stack:
+			top = stack[-1]
+			if top[1] > 0: # next child header
+				top[1] -= 1
+				child = self.new_node(pos)
+				top[2].append(child)
+				stack.append([child, stream[pos], []])
+				pos += 2
+			else: # all children read, metadata follows
+				node, left, children = stack.pop()
+				self.child_offset[node] = len(self.child_ids)
+				self.child_count[node] = len(children)
+				self.child_ids.extend(children)
+				self.meta_offset[node] = pos
+				pos += self.meta_count[node]
+				metadata = stream[self.meta_offset[node]:pos]
+				self.totals[node] = sum(metadata) + sum(self.totals[c] for c in children)
+				self.values[node] = node_value(metadata, [self.values[c] for c in children])
+		self.end = pos
+
+	def new_node(self, header):
+		self.child_offset.append(0)
+		self.child_count.append(0)
+		self.meta_offset.append(0)
+		self.meta_count.append(self.stream[header+1])
+		self.totals.append(0)
+		self.values.append(0)
+		return len(self.meta_count) - 1
+
+	def node(self, idx = 0):
+		return NodeView(self, idx)
+
+class NodeView(object):
+	# light handle onto one node of a LicenseTree (new style class so
+	# __slots__ applies)
+	__slots__ = ('tree', 'idx')
+
+	def __init__(self, tree, idx):
+		self.tree = tree
+		self.idx = idx
+
+	@property
+	def metadata(self):
+		start = self.tree.meta_offset[self.idx]
+		return self.tree.stream[start:start + self.tree.meta_count[self.idx]]
+
+	@property
+	def children(self):
+		start = self.tree.child_offset[self.idx]
+		ids = self.tree.child_ids[start:start + self.tree.child_count[self.idx]]
+		return [NodeView(self.tree, c) for c in ids]
+
+	def sum_meta(self):
+		return self.tree.totals[self.idx]
+
+	def sum_meta2(self):
+		return self.tree.values[self.idx]
+
+def license_sums(stream):
+	# (metadata sum, root value) in one streaming pass keeping no tree,
+	# only the path of open nodes and their children's values
+	if len(stream) == 0:
+		return (0, 0)
+	total = 0
+	stack = [[stream[0], stream[1], []]] # children left, num_meta, child values
+	pos = 2
+	while True:
+		top = stack[-1]
+		if top[0] > 0: # next child header
+			top[0] -= 1
+			stack.append([stream[pos], stream[pos+1], []])
+			pos += 2
+		else: # all children read, metadata follows
+			stack.pop()
+			metadata = stream[pos:pos + top[1]]
+			pos += top[1]
+			total += sum(metadata)
+			value = node_value(metadata, top[2])
+			if not stack:
+				return (total, value)
+			stack[-1][2].append(value)
+
 if __name__ == "__main__":
 
 	#Part 1 Solution
 	
-	stream = [] # in sequence list of numbers in input file
 	root = Node()
 	
 	with open("day8_input", "r") as infile:
-		stream = infile.read().strip().split(" ")
-	stream = [ int(x) for x in stream ]
+		# in sequence list of numbers in input file
+		stream = array('i', (int(x) for x in infile.read().split()))
 	parse_node(root, stream)
 	print root.sum_meta()
 	
@@ -66,85 +66,49 @@ Although it hasn't changed, you can still get your puzzle input.
 
 """
 
-class Marble:
-
-	def __init__(self, value):
-		self.value = value
-		self.next = None
-		self.prev = None
-		
-class Circle:
-
-	def __init__(self):
-		self.head = None
-	
-	def insert(self, value):
-		marble = Marble(value)
-		
-		# first addition
-		if self.head == None:
-			self.head = marble
-			marble.next = marble
-			marble.prev = marble
-			return 0
-		# special case divisible by 23
-		elif marble.value % 23 == 0:
-			# find marble 7 counter-clockwise from heaad
-			for i in range(7):
-				self.head = self.head.prev
-			retval = marble.value + self.head.value
-			# new head is clockwise to marble to remove
-			self.head = self.head.next
-			# prune out node to remove
-			self.head.prev = self.head.prev.prev
-			self.head.prev.next = self.head
-			return retval
-		# normal insert
+from array import array
+
+def play(num_players, max_marbles):
+	# The circle is kept as a queue in one preallocated array('i') ring
+	# buffer, with the current marble at the tail.  A normal turn moves
+	# the head marble to the tail and places the new marble after it; a
+	# multiple of 23 moves the last 7 marbles back onto the head, scores
+	# the one before them, then moves one marble head to tail again.
+	# Uses 4 bytes per marble and no per-marble objects.
+	size = max_marbles + 2
+	ring = array('i', [0]) * size
+	head = 0 # first marble in queue
+	tail = 1 # one past the current marble
+	scores = [0] * num_players
+	for marble in xrange(1, max_marbles + 1):
+		if marble % 23 != 0:
+			ring[tail] = ring[head]
+			head = head + 1 if head + 1 < size else 0
+			tail = tail + 1 if tail + 1 < size else 0
+			ring[tail] = marble
+			tail = tail + 1 if tail + 1 < size else 0
 		else:
-			l = self.head.next
-			r = self.head.next.next
-			l.next = marble
-			marble.prev = l
-			r.prev = marble
-			marble.next = r
-			self.head = marble
-			return 0
+			# find marble 7 counter-clockwise from current
+			for i in range(7):
+				tail = tail - 1 if tail > 0 else size - 1
+				head = head - 1 if head > 0 else size - 1
+				ring[head] = ring[tail]
+			tail = tail - 1 if tail > 0 else size - 1
+			scores[(marble - 1) % num_players] += marble + ring[tail]
+			# new current is clockwise to marble removed
+			ring[tail] = ring[head]
+			head = head + 1 if head + 1 < size else 0
+			tail = tail + 1 if tail + 1 < size else 0
+	return max(scores)
 
 if __name__ == "__main__":
 
 	#Part 1 Solution
 	
-	num_players = 432
-	next_marble = 0
-	max_marbles = 71019 
-	scores = [0] * num_players
-	turn = 0
-	circle = Circle()
-	circle.insert(next_marble)
-	
-	while next_marble < max_marbles:
-		next_marble += 1
-		scores[turn] += circle.insert(next_marble)
-		turn += 1
-		turn %= len(scores)
-	
-	print max(scores)
+	print play(432, 71019)
 	
 	# Part 2 Solution
-	num_players = 432
-	next_marble = 0
-	max_marbles = 71019*100
-	scores = [0] * num_players
-	turn = 0
-	circle = Circle()
-	circle.insert(next_marble)
-	
-	while next_marble < max_marbles:
-		next_marble += 1
-		scores[turn] += circle.insert(next_marble)
-		turn += 1
-		turn %= len(scores)
 	
-	print max(scores)
+	print play(432, 71019*100)
 		
 	